@@ -1,10 +1,15 @@
 #cli file
-from profile_models import GeneratorConfig, Target
+from profile_models import GeneratorConfig, Target, STRATEGY_NAMES, SCHEDULES
 from profile_models import Person, Pet
-from engine import PasswordGenerator
-from utils import banner, estimate_file_size, number_to_human_readable
+from engine import PasswordGenerator, parse_part
+from markov_filter import MarkovModel, VECTORIZED
+from profiler import GenerationProfiler, PROFILE_CHUNK_SIZE
+from utils import banner, estimate_file_size, number_to_human_readable, parse_duration
 from datetime import date
 import argparse
+import itertools
+import os
+import time
 from typing import Optional, List
 import sys
 
@@ -59,6 +64,26 @@ def parse_date(date_str: str):
     
     return date(year, month, day)
 
+def parse_duration_arg(duration_str: str) -> float:
+    try:
+        return parse_duration(duration_str)
+    except ValueError as ve:
+        raise argparse.ArgumentTypeError(str(ve))
+
+def parse_strategy_quota(quota_str: str):
+    # NAME=N, e.g. keyword_suffix_special=1000000
+    name, sep, value = quota_str.partition("=")
+    name = name.strip()
+    if not sep or name not in STRATEGY_NAMES or not value.strip().isdigit():
+        raise argparse.ArgumentTypeError(f"Strategy quota must be NAME=N with NAME one of: {', '.join(STRATEGY_NAMES)}")
+    return name, int(value)
+
+def _parse_part_arg(part_str: str):
+    try:
+        return parse_part(part_str)
+    except ValueError as ve:
+        raise argparse.ArgumentTypeError(str(ve))
+
 def _ask_date(prompt: str) -> Optional[date]:
     while True:
         s = _ask(prompt + " (DDMMYYYY, blank to skip)").strip()
@@ -114,7 +139,28 @@ def _collect_pets() -> List[Pet]:
         pets.append(_collect_pet())
     return pets
 
-def run_interactive(cfg: Optional[GeneratorConfig] = None, output_path: Optional[str] = None):
+def _write_passwords(f, passwords, profiler: Optional[GenerationProfiler] = None):
+    if profiler is None:
+        for pw in passwords:
+            f.write(pw + "\n")
+        return
+    # Profiled run: generate a chunk, then time writing it, so file I/O shows up separately from generation
+    perf_counter = time.perf_counter
+    write_seconds = 0.0
+    passwords = iter(passwords)
+    while True:
+        chunk = list(itertools.islice(passwords, PROFILE_CHUNK_SIZE))
+        if not chunk:
+            break
+        start = perf_counter()
+        for pw in chunk:
+            f.write(pw + "\n")
+        write_seconds += perf_counter() - start
+    profiler.add_time("write_output", write_seconds)
+
+def run_interactive(cfg: Optional[GeneratorConfig] = None, output_path: Optional[str] = None,
+                    profile_prefix: Optional[str] = None, use_cprofile: bool = False, part=None,
+                    markov_model: Optional[MarkovModel] = None):
     print("Interactive mode: answer the following about your target.\n")
     print("blank entries will be skipped\n")
     print("---------------------------------\n")
@@ -159,16 +205,35 @@ def run_interactive(cfg: Optional[GeneratorConfig] = None, output_path: Optional
         special_numbers=special_numbers,
     )
 
-    gen = PasswordGenerator(target, cfg)
+    profiler = GenerationProfiler(use_cprofile=use_cprofile) if profile_prefix is not None else None
+    gen = PasswordGenerator(target, cfg, profiler=profiler, part=part, markov_model=markov_model)
+
+    if cfg.normalize_keywords:
+        report = gen.keyword_normalization_report()
+        change = report["pairs"] / report["raw_pairs"] - 1 if report["raw_pairs"] else 0
+        print(f"\nKeyword normalization: {report['raw_keywords']} keywords -> {report['keywords']}, "
+              f"{report['raw_variants']:,} -> {report['variants']:,} variants, "
+              f"{report['raw_pairs']:,} -> {report['pairs']:,} word pairs ({change:+.0%})")
+        if "folded_pairs" in report:
+            # Folding adds spellings, so it is shown apart from what normalization saved
+            change = report["folded_pairs"] / report["pairs"] - 1 if report["pairs"] else 0
+            print(f"ASCII folding: {report['variants']:,} -> {report['folded_variants']:,} variants, "
+                  f"{report['pairs']:,} -> {report['folded_pairs']:,} word pairs ({change:+.1%})")
 
     password_count = gen.estimate_password_count()
     if password_count > cfg.max_passwords:
         print(f"notice Estimated password count ({password_count:,}) exceeds max_passwords limit ({cfg.max_passwords:,}).")
         password_count = cfg.max_passwords
     
+    if part is not None:
+        print(f"\nGenerating part {part[0]} of {part[1]}; caps and the time budget apply to this part only.")
     print(f"\nEstimated number of passwords to be generated: {password_count:,}  ({number_to_human_readable(password_count)})")
     size_estimate = estimate_file_size(password_count, cfg.min_length, cfg.max_length)
     print(f"Estimated output file size: {size_estimate}\n")
+    if cfg.markov_model:
+        print(f"Markov filter enabled ({cfg.markov_model}, threshold {cfg.markov_threshold}); the output will be smaller than estimated.\n")
+    if cfg.time_budget is not None:
+        print(f"Generation is time-boxed to {cfg.time_budget:g}s ({cfg.schedule} schedule); the output may be smaller than estimated.\n")
     if not _ask_yes_no("Proceed with generation?", True):
         print("Generation cancelled.")
         return
@@ -181,15 +246,31 @@ def run_interactive(cfg: Optional[GeneratorConfig] = None, output_path: Optional
 
     try:
         with open(outfile, "w", encoding="utf-8") as f:
-            for pw in gen.generate_passwords():
-                f.write(pw + "\n")
+            if profiler is not None:
+                with profiler.session():
+                    _write_passwords(f, gen.generate_passwords(), profiler)
+            else:
+                _write_passwords(f, gen.generate_passwords())
         print(f"Saved {outfile}")
     except Exception as e:
         print(f"Failed to write output file '{outfile}': {e}")
+        return
+
+    if profiler is not None:
+        report_prefix = profile_prefix or f"{os.path.splitext(outfile)[0]}.profile"
+        try:
+            json_path, collapsed_path = profiler.write_report(report_prefix)
+            print(f"Saved profile report {json_path} and collapsed stacks {collapsed_path}")
+        except OSError as e:
+            print(f"Failed to write profile report '{report_prefix}': {e}")
         
 
 def _build_config_from_args(args) -> GeneratorConfig:
-    cfg = GeneratorConfig.from_file()
+    try:
+        cfg = GeneratorConfig.from_file()
+    except ValueError as ve:
+        print(f"Configuration error: {ve}")
+        sys.exit(2)
     # Apply overrides if provided
     if getattr(args, "min_length", None) is not None:
         cfg.min_length = args.min_length
@@ -213,6 +294,24 @@ def _build_config_from_args(args) -> GeneratorConfig:
         cfg.add_common_numbers = False
     if getattr(args, "bruteforce", False):
         cfg.bruteforce_mode = True
+    if getattr(args, "no_normalize", False):
+        cfg.normalize_keywords = False
+    if getattr(args, "ascii_fold", False):
+        cfg.ascii_fold_keywords = True
+    if getattr(args, "time_budget", None) is not None:
+        cfg.time_budget = args.time_budget
+    if getattr(args, "schedule", None) is not None:
+        cfg.schedule = args.schedule
+    for name in getattr(args, "disable_strategy", None) or []:
+        cfg.strategies.setdefault(name, {})["enabled"] = False
+    for name, quota in getattr(args, "strategy_quota", None) or []:
+        cfg.strategies.setdefault(name, {})["max_passwords"] = quota
+    if getattr(args, "markov_model", None) is not None:
+        cfg.markov_model = args.markov_model
+    if getattr(args, "markov_threshold", None) is not None:
+        cfg.markov_threshold = args.markov_threshold
+    if getattr(args, "no_markov_filter", False):
+        cfg.markov_model = None
     try:
         cfg.__post_init__()  # re-validate after overrides
     except ValueError as ve:
@@ -220,10 +319,43 @@ def _build_config_from_args(args) -> GeneratorConfig:
         sys.exit(2)
     return cfg
 
+def _load_markov_model(cfg: GeneratorConfig) -> Optional[MarkovModel]:
+    """Load the configured Markov model, so a missing or corrupt one fails before the questionnaire, not after it."""
+    if not cfg.markov_model:
+        return None
+    if not os.path.exists(cfg.markov_model):
+        print(f"Markov model '{cfg.markov_model}' not found (train one with --train-markov CORPUS)")
+        sys.exit(2)
+    try:
+        model = MarkovModel.from_file(cfg.markov_model)
+    except (ValueError, OSError) as e:
+        print(f"Failed to load Markov model '{cfg.markov_model}': {e}")
+        sys.exit(2)
+    if not VECTORIZED:
+        print("warning: numpy is not installed, so the Markov filter falls back to pure Python and can make "
+              "generation several times slower (pip install numpy)")
+    return model
+
 def _run_interactive_with_overrides(args):
     """Run interactive flow using config built from args; affects only -i path."""
     cfg = _build_config_from_args(args)
-    run_interactive(cfg, output_path=getattr(args, "output", None))
+    markov_model = _load_markov_model(cfg)
+    run_interactive(cfg, output_path=getattr(args, "output", None), profile_prefix=getattr(args, "profile", None),
+                    use_cprofile=getattr(args, "cprofile", False), part=getattr(args, "part", None),
+                    markov_model=markov_model)
+
+def _train_markov(args):
+    """Train a Markov filter model from a password corpus (one password per line)."""
+    model_path = args.markov_model or "markov.bin"
+    print(f"Training order-{args.markov_order} Markov model from '{args.train_markov}'...")
+    try:
+        with open(args.train_markov, "r", encoding="utf-8", errors="ignore") as f:
+            model = MarkovModel.train(f, order=args.markov_order)
+        model.save(model_path)
+    except OSError as e:
+        print(f"Failed to train Markov model: {e}")
+        sys.exit(1)
+    print(f"Saved {model_path} (use it with --markov-model {model_path} or \"markov_model\" in config.json)")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -236,6 +368,10 @@ def main():
     mode_group = parser.add_argument_group("  Execution Mode")
     mode_group.add_argument("-h", "--help", action="help", help="Show this help message and exit")
     mode_group.add_argument("-i", "--interactive", action="store_true", help="Start the interactive generation wizard")
+    mode_group.add_argument("--train-markov", type=str, metavar="CORPUS", help="Train a Markov filter model from a password list and save it to --markov-model")
+    mode_group.add_argument("--part", type=_parse_part_arg, metavar="K/N", help="Only generate the K-th of N equal slices (for splitting one run across N machines)")
+    mode_group.add_argument("--profile", nargs="?", const="", metavar="PREFIX", help="Profile the run and write PREFIX.json and PREFIX.collapsed\n(defaults to '<output>.profile')")
+    mode_group.add_argument("--cprofile", action="store_true", help="With --profile, also collect cProfile function stats (much slower)")
     mode_group.add_argument("-o", "--output", type=str, metavar="FILE", help="Output file path (defaults to '<target>.txt' or 'target.txt')")
 
     # --- Group 2: Configuration Overrides ---
@@ -250,13 +386,24 @@ def main():
     config_group.add_argument("--leet-level", type=int, choices=[0,1,2], metavar="LVL", help="Leet substitution level (0, 1, or 2)")
     config_group.add_argument("--max-depth", type=int, metavar="N", help="Max combination depth (e.g., 2 or 3)")
     config_group.add_argument("--separators", type=str, metavar="CHARS", help="Comma-separated separators (e.g. ',-,_,!')")
+    config_group.add_argument("--time-budget", type=parse_duration_arg, metavar="DURATION", help="Stop generating after this wall-clock time (e.g. 90s, 10m, 1h)")
+    config_group.add_argument("--schedule", choices=SCHEDULES, help="How strategies share the time budget and caps")
+    config_group.add_argument("--strategy-quota", type=parse_strategy_quota, action="append", metavar="NAME=N", help="Cap the passwords generated by one strategy (repeatable)")
+    config_group.add_argument("--disable-strategy", choices=STRATEGY_NAMES, action="append", metavar="NAME", help=f"Skip a strategy (repeatable): {', '.join(STRATEGY_NAMES)}")
     
+    config_group.add_argument("--markov-model", type=str, metavar="FILE", help="Drop implausible candidates using this Markov model (default output of --train-markov: markov.bin)")
+    config_group.add_argument("--markov-threshold", type=float, metavar="X", help="Minimum average log2 probability per char to keep a candidate (e.g. -6.0)")
+    config_group.add_argument("--markov-order", type=int, choices=[1, 2], default=2, metavar="N", help="Context length used by --train-markov (1 or 2)")
+
     # Boolean flags
     config_group.add_argument("--bruteforce", action="store_true", help="Enable bruteforce mode (creates more variants)")
     config_group.add_argument("--no-case-mutations", action="store_true", help="Disable case mutations (Capitalization)")
     config_group.add_argument("--no-reverse", action="store_true", help="Disable reverse mutations")
     config_group.add_argument("--no-special-chars", action="store_true", help="Disable special characters")
     config_group.add_argument("--no-common-numbers", action="store_true", help="Disable appending common numbers")
+    config_group.add_argument("--no-normalize", action="store_true", help="Keep keywords exactly as entered (no trimming or merging of duplicates)")
+    config_group.add_argument("--ascii-fold", action="store_true", help="Also add accent-free spellings of keywords (José -> Jose); grows the keyspace")
+    config_group.add_argument("--no-markov-filter", action="store_true", help="Disable the Markov filter set in config.json")
 
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
@@ -264,7 +411,9 @@ def main():
 
     args = parser.parse_args()
 
-    if args.interactive:
+    if args.train_markov:
+        _train_markov(args)
+    elif args.interactive:
         _run_interactive_with_overrides(args)
     else:
         # If user provides flags but forgets -i, we can hint them or just show help
@@ -1,13 +1,51 @@
 import itertools
+import time
 from logging import config
-from typing import Iterator, List
-from profile_models import Target, GeneratorConfig
-from utils import DateUtils
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from profile_models import Target, GeneratorConfig, STRATEGY_NAMES
+from utils import DateUtils, TextUtils
+from markov_filter import MarkovModel, MarkovPrefilter
+from profiler import GenerationProfiler
+
+ROUND_ROBIN_CHUNK = 1000  # candidates a strategy emits per turn (times its weight) in round-robin mode
+FILTER_BATCH_SIZE = 4096  # candidates scored at once by the Markov filter
+
+
+class WordPools(NamedTuple):
+    # Everything is sorted so every process enumerates candidates in the same order (needed by --part)
+    keyword_pools: List[List[str]]
+    flat_keywords: List[str]
+    singles: List[str]  # keywords, numbers and dates
+    suffixes: List[str]
+    specials: List[str]
+    separators: List[str]
+    pair_count: int  # (wordA, wordB) pairs across different keyword groups
+
+
+def parse_part(part: str) -> Tuple[int, int]:
+    """Parse a 'K/N' slice spec (1 <= K <= N) into (K, N)."""
+    k, sep, n = part.partition("/")
+    if not sep or not k.strip().isdigit() or not n.strip().isdigit():
+        raise ValueError("Part must be in K/N format, e.g. 2/4")
+    k, n = int(k), int(n)
+    if not 1 <= k <= n:
+        raise ValueError(f"Part {k}/{n} is out of range (K must be between 1 and N)")
+    return k, n
+
 
 class PasswordGenerator:
-    def __init__(self, target: Target, config: GeneratorConfig):
+    def __init__(self, target: Target, config: GeneratorConfig, profiler: Optional[GenerationProfiler] = None,
+                 part: Optional[Tuple[int, int]] = None, markov_model: Optional[MarkovModel] = None):
         self.target = target
         self.config = config
+        if part is not None and not 1 <= part[0] <= part[1]:
+            raise ValueError(f"Part {part[0]}/{part[1]} is out of range (K must be between 1 and N)")
+        self.part = part  # (K, N): only generate the K-th of N slices of every strategy
+        # `markov_model` is config.markov_model already loaded by the caller, so it isn't read twice
+        if markov_model is None and config.markov_model:
+            markov_model = MarkovModel.from_file(config.markov_model)
+        self.markov_model = markov_model if config.markov_model else None
+        self.profiler = profiler
 
     def _is_valid_length(self, password: str) -> bool:
         return self.config.min_length <= len(password) <= self.config.max_length
@@ -42,21 +80,49 @@ class PasswordGenerator:
             return [word]
         return [word[::-1]]
     
-    def _build_base_word_pool(self) -> List[List[str]]:
-        raw_keywords = set(self.target.get_keywords())
+    def _raw_keywords(self) -> List[str]:
+        raw_keywords = list(self.target.get_keywords())
         for relation in self.target.parents + self.target.children + self.target.partners + self.target.pets:
-            raw_keywords.update(relation.get_keywords())
-
-        if self.target.name:
-            raw_keywords.add(self.target.name[0:1].lower())
-            raw_keywords.add(self.target.name[0:1].upper())
-        if self.target.family_name:
-            raw_keywords.add(self.target.family_name[0:1].lower())
-            raw_keywords.add(self.target.family_name[0:1].upper())
+            raw_keywords.extend(relation.get_keywords())
+
+        name = (self.target.name or "").strip()
+        if name:
+            raw_keywords.append(name[0:1].lower())
+            raw_keywords.append(name[0:1].upper())
+        family_name = (self.target.family_name or "").strip()
+        if family_name:
+            raw_keywords.append(family_name[0:1].lower())
+            raw_keywords.append(family_name[0:1].upper())
         
-        raw_keywords.update(self.target.special_keywords)
-        all_keyword_variants = []   
+        raw_keywords.extend(self.target.special_keywords)
+        return raw_keywords
+
+    def _keyword_groups(self, raw_keywords: List[str], ascii_fold: Optional[bool] = None) -> List[Set[str]]:
+        """Spellings that stand for the same keyword, e.g. {"José", "jose"} from a name and a child's name.
+
+        Keywords are merged when they only differ in case or accents either way; `ascii_fold` (by default
+        config.ascii_fold_keywords) also adds the accent-free spelling of each one, which grows the pool.
+        """
+        if not self.config.normalize_keywords:
+            return [{keyword} for keyword in set(raw_keywords)]
+        if ascii_fold is None:
+            ascii_fold = self.config.ascii_fold_keywords
+
+        groups: Dict[str, Set[str]] = {}
         for keyword in raw_keywords:
+            keyword = TextUtils.normalize_keyword(keyword)
+            if not keyword:
+                continue
+            folded = TextUtils.ascii_fold(keyword)
+            spellings = groups.setdefault(folded.casefold(), set())
+            spellings.add(keyword)
+            if ascii_fold:
+                spellings.add(folded)
+        return list(groups.values())
+
+    def _keyword_variants(self, spellings: Set[str]) -> Set[str]:
+        variants = set()
+        for keyword in spellings:
             case_forms = set(self._generate_leet(keyword))
             case_forms.update(self._apply_case_mutations(keyword))
             if self.config.bruteforce_mode:
@@ -66,9 +132,41 @@ class PasswordGenerator:
                 case_forms.update(reversed_forms)
             else:
                 case_forms.update(self._apply_reverse(keyword))
-            all_keyword_variants.append(list(case_forms))
+            variants.update(case_forms)
+        return variants
+
+    def _build_base_word_pool(self, ascii_fold: Optional[bool] = None) -> List[List[str]]:
+        # Different keywords can expand to the same variants (e.g. "ali" and its reverse "ila"), but pairing
+        # them still yields distinct passwords, so groups are only merged by their normalized key
+        groups = self._keyword_groups(self._raw_keywords(), ascii_fold)
+        return [list(self._keyword_variants(spellings)) for spellings in groups]
+
+    @staticmethod
+    def _pair_count(keyword_pools: List[List[str]]) -> int:
+        total = sum(len(group) for group in keyword_pools)
+        # sum of len(a) * len(b) over ordered pairs of different groups
+        return total * total - sum(len(group) ** 2 for group in keyword_pools)
 
-        return all_keyword_variants
+    def keyword_normalization_report(self) -> Dict[str, int]:
+        """Keyword pool size with and without normalization, to show how much the keyspace shrank.
+
+        The growth from ASCII folding is reported separately, as folded_variants and folded_pairs, when it is on.
+        """
+        raw_pools = [list(self._keyword_variants({keyword})) for keyword in set(self._raw_keywords())]
+        pools = self._build_base_word_pool(ascii_fold=False)
+        report = {
+            "raw_keywords": len(raw_pools),
+            "keywords": len(pools),
+            "raw_variants": len(set(itertools.chain.from_iterable(raw_pools))),
+            "variants": len(set(itertools.chain.from_iterable(pools))),
+            "raw_pairs": self._pair_count(raw_pools),
+            "pairs": self._pair_count(pools),
+        }
+        if self.config.ascii_fold_keywords:
+            folded_pools = self._build_base_word_pool(ascii_fold=True)
+            report["folded_variants"] = len(set(itertools.chain.from_iterable(folded_pools)))
+            report["folded_pairs"] = self._pair_count(folded_pools)
+        return report
     
     def _dates_pool(self) -> List[str]:
         date_permutations = []
@@ -84,199 +182,355 @@ class PasswordGenerator:
     def _numbers_pool(self) -> List[str]:
         return self.target.special_numbers
     
-    def generate_passwords(self) -> Iterator[str]:
-        keyword_pools = self._build_base_word_pool()
-        flat_keywords = set(itertools.chain.from_iterable(keyword_pools))
-        date_pool = set(self._dates_pool())
+    def _collect_pools(self) -> WordPools:
+        if self.profiler is not None:
+            with self.profiler.phase("build_word_pool"):
+                keyword_pools = self._build_base_word_pool()
+            with self.profiler.phase("dates_pool"):
+                date_pool = set(self._dates_pool())
+        else:
+            keyword_pools = self._build_base_word_pool()
+            date_pool = set(self._dates_pool())
         number_pool = set(self._numbers_pool())
         if self.config.add_common_numbers:
             number_pool.update(self.config.common_numbers)
-        specials = self.config.special_chars if self.config.add_special_chars else ['']
-        separators = self.config.separators
+        keyword_pools = sorted(sorted(group) for group in keyword_pools)
+        flat_keywords = set(itertools.chain.from_iterable(keyword_pools))
+        return WordPools(
+            keyword_pools=keyword_pools,
+            flat_keywords=sorted(flat_keywords),
+            singles=sorted(flat_keywords | number_pool | date_pool),
+            suffixes=sorted(number_pool | date_pool),
+            specials=self.config.special_chars if self.config.add_special_chars else [''],
+            separators=self.config.separators,
+            pair_count=self._pair_count(keyword_pools),
+        )
 
-        # Max passwords cap
-        limit = self.config.max_passwords if self.config.max_passwords is not None and self.config.max_passwords > 0 else None
-        count = 0
+    def _part_range(self, total_units: int) -> Tuple[int, int]:
+        """[start, stop) of this node's slice of a strategy's `total_units` units."""
+        if self.part is None:
+            return 0, total_units
+        k, n = self.part
+        return total_units * (k - 1) // n, total_units * k // n
+
+    def _units(self, name: str, units: Iterator, total_units: int, deadline: Optional[float]) -> Iterator:
+        """The units strategy `name` iterates over: this node's part of them, stopping once `deadline` passes."""
+        # Every unit of a strategy expands to the same number of candidates (see _strategy_units),
+        # so equal unit ranges give every node the same estimated share of the strategy's output.
+        if self.part is not None:
+            units = itertools.islice(units, *self._part_range(total_units))
+        if deadline is not None:
+            units = self._until(units, deadline)
+        if self.profiler is not None:
+            units = self.profiler.counted_units(name, units)
+        return units
 
-        #strategy 1: single keywords
-        for k in (flat_keywords | number_pool | date_pool):
-            if limit is not None and count >= limit:
+    @staticmethod
+    def _until(units: Iterator, deadline: float) -> Iterator:
+        # Checked per unit rather than per yielded password: a strategy whose candidates all fail the
+        # length check yields nothing, but still has to stop on time
+        monotonic = time.monotonic
+        for unit in units:
+            if monotonic() >= deadline:
                 return
+            yield unit
+
+    def _word_pairs(self, name: str, pools: WordPools, deadline: Optional[float]) -> Iterator[Tuple[str, str]]:
+        pairs = itertools.chain.from_iterable(
+            itertools.product(group_a, group_b) for group_a, group_b in itertools.permutations(pools.keyword_pools, 2)
+        )
+        return self._units(name, pairs, pools.pair_count, deadline)
+
+    def _keyword_suffix_units(self, name: str, pools: WordPools, deadline: Optional[float]) -> Iterator[Tuple[str, str, str]]:
+        units = itertools.product(pools.flat_keywords, pools.separators, pools.suffixes)
+        return self._units(name, units, len(pools.flat_keywords) * len(pools.separators) * len(pools.suffixes), deadline)
+
+    def _markov_prefilter(self, name: str, pools: WordPools) -> Optional[Callable[..., bool]]:
+        """On a Markov-filtered run, `skip(n, *tokens)`: True when the filter is certain to reject all `n`
+        candidates built from `tokens`, so the strategy can drop them before formatting or scoring any."""
+        if self.markov_model is None:
+            return None
+        vocabulary = itertools.chain(pools.singles, pools.separators, pools.specials)
+        may_pass = MarkovPrefilter(self.markov_model, vocabulary, self.config.markov_threshold).may_pass
+        min_length, max_length = self.config.min_length, self.config.max_length
+        stats = self.profiler.strategy_stats(name) if self.profiler is not None else None
+
+        def skip(n: int, *tokens: str) -> bool:
+            # Candidates of the wrong length are left to the strategy's own length check
+            if not min_length <= sum(map(len, tokens)) <= max_length or may_pass(*tokens):
+                return False
+            if stats is not None:
+                stats["markov_skipped"] += n
+            return True
+        return skip
+
+    def _strategy_enabled(self, name: str) -> bool:
+        if not self.config.strategy_settings(name)["enabled"]:
+            return False
+        if name in ("keyword_suffix_special", "keyword_special"):
+            return self.config.add_special_chars
+        if name == "multi_word":
+            return self.config.max_combination_depth >= 2
+        if name == "multi_word_suffix":
+            return self.config.max_combination_depth >= 3
+        return True
+
+    #strategy 1: single keywords
+    def _strategy_single(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        for k in self._units("single", iter(pools.singles), len(pools.singles), deadline):
             if self._is_valid_length(k):
-                count += 1
                 yield k
-        
-        #strategy 2: keyword + suffix combinations
-        suffixes = number_pool.union(date_pool)
-        for k, sep, suf in itertools.product(flat_keywords, separators, suffixes):
-            if limit is not None and count >= limit:
-                return
+
+    #strategy 2: keyword + suffix combinations
+    def _strategy_keyword_suffix(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        skip = self._markov_prefilter("keyword_suffix", pools)
+        for k, sep, suf in self._keyword_suffix_units("keyword_suffix", pools, deadline):
+            if skip is not None and skip(2, k, sep, suf):
+                continue
             password = f"{k}{sep}{suf}" # keyword+separator+suffix example: ali&1992 ,ali1992
             if self._is_valid_length(password):
-                count += 1
                 yield password
             password = f"{suf}{sep}{k}" # suffix+separator+keyword example: 1992&ali ,1992ali
             if self._is_valid_length(password):
-                count += 1
                 yield password
-            
-            #strategy 3: strategy 2 with special chars
-            if self.config.add_special_chars:
-                for special in specials:
-                    if limit is not None and count >= limit:
-                        return
-                    password = f"{k}{sep}{suf}{special}" # keyword+separator+suffix+special example: ali&1992!
-                    if self._is_valid_length(password):
-                        count += 1
-                        yield password
-                    password = f"{special}{k}{sep}{suf}" # special+keyword+separator+suffix example: !ali&1992
-                    if self._is_valid_length(password):
-                        count += 1
-                        yield password
-                    password = f"{suf}{sep}{k}{special}" # suffix+separator+keyword+special example: 1992&ali!
-                    if self._is_valid_length(password):
-                        count += 1
-                        yield password
-                    password = f"{special}{suf}{sep}{k}" # special+suffix+separator+keyword example: !1992&ali
-                    if self._is_valid_length(password):
-                        count += 1
-                        yield password
-
-        #strategy 4: keyword + special
-        if self.config.add_special_chars:
-            for k, special in itertools.product(flat_keywords, specials):
-                if limit is not None and count >= limit:
-                    return
-                password = f"{k}{special}" # keyword+special example: ali!
+
+    #strategy 3: strategy 2 with special chars
+    def _strategy_keyword_suffix_special(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        skip = self._markov_prefilter("keyword_suffix_special", pools)
+        for k, sep, suf in self._keyword_suffix_units("keyword_suffix_special", pools, deadline):
+            for special in pools.specials:
+                if skip is not None and skip(4, k, sep, suf, special):
+                    continue
+                password = f"{k}{sep}{suf}{special}" # keyword+separator+suffix+special example: ali&1992!
                 if self._is_valid_length(password):
-                    count += 1
                     yield password
-                password = f"{special}{k}" # special+keyword example: !ali
+                password = f"{special}{k}{sep}{suf}" # special+keyword+separator+suffix example: !ali&1992
+                if self._is_valid_length(password):
+                    yield password
+                password = f"{suf}{sep}{k}{special}" # suffix+separator+keyword+special example: 1992&ali!
+                if self._is_valid_length(password):
+                    yield password
+                password = f"{special}{suf}{sep}{k}" # special+suffix+separator+keyword example: !1992&ali
                 if self._is_valid_length(password):
-                    count += 1
                     yield password
 
-        # strategy 5: Multi-Word Combinations
-        if self.config.max_combination_depth >= 2:
-            for group_a, group_b in itertools.permutations(keyword_pools, 2):
-                for word_a, word_b in itertools.product(group_a, group_b):
-                    for sep in separators:
-                        # Base: wordA+separator+wordB example: ali&Wonder
-                        password = f"{word_a}{sep}{word_b}"
-                        if self._is_valid_length(password):
-                            count += 1
-                            if limit is not None and count > limit:
-                                return
-                            yield password
-
-                        # strategy 6: Multi-Word Combinations with suffix (and special chars)
-                        if self.config.max_combination_depth >= 3:
-                            for suff in suffixes:
-                               
-                                suffix_variations = [
-                                    f"{word_a}{sep}{word_b}{suff}", # wordA+separator+wordB+suffix example: ali&Wonder1992
-                                    f"{suff}{word_a}{sep}{word_b}", # suffix+wordA+separator+wordB example: 1992ali&Wonder
-                                    f"{word_a}{suff}{sep}{word_b}", # wordA+suffix+separator+wordB example: ali1992&Wonder
-                                ]
-
-                                # Add separator-dependent variation if separator exists
-                                if sep:
-                                    suffix_variations.append(f"{word_a}{sep}{suff}{word_b}") # wordA+separator+suffix+wordB example: ali&1992Wonder
-
-                                # Optimization: If the basic structure is too long, skip all variations for this suffix
-                                if not self._is_valid_length(suffix_variations[0]):
-                                    continue 
+    #strategy 4: keyword + special
+    def _strategy_keyword_special(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        units = itertools.product(pools.flat_keywords, pools.specials)
+        skip = self._markov_prefilter("keyword_special", pools)
+        for k, special in self._units("keyword_special", units, len(pools.flat_keywords) * len(pools.specials), deadline):
+            if skip is not None and skip(2, k, special):
+                continue
+            password = f"{k}{special}" # keyword+special example: ali!
+            if self._is_valid_length(password):
+                yield password
+            password = f"{special}{k}" # special+keyword example: !ali
+            if self._is_valid_length(password):
+                yield password
+
+    # strategy 5: Multi-Word Combinations
+    def _strategy_multi_word(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        skip = self._markov_prefilter("multi_word", pools)
+        for word_a, word_b in self._word_pairs("multi_word", pools, deadline):
+            for sep in pools.separators:
+                if skip is not None and skip(1, word_a, sep, word_b):
+                    continue
+                # Base: wordA+separator+wordB example: ali&Wonder
+                password = f"{word_a}{sep}{word_b}"
+                if self._is_valid_length(password):
+                    yield password
+
+    # strategy 6: Multi-Word Combinations with suffix (and special chars)
+    def _strategy_multi_word_suffix(self, pools: WordPools, deadline: Optional[float] = None) -> Iterator[str]:
+        specials = pools.specials
+        skip = self._markov_prefilter("multi_word_suffix", pools)
+        for word_a, word_b in self._word_pairs("multi_word_suffix", pools, deadline):
+            for sep in pools.separators:
+                for suff in pools.suffixes:
+                       
+                    suffix_variations = [
+                        f"{word_a}{sep}{word_b}{suff}", # wordA+separator+wordB+suffix example: ali&Wonder1992
+                        f"{suff}{word_a}{sep}{word_b}", # suffix+wordA+separator+wordB example: 1992ali&Wonder
+                        f"{word_a}{suff}{sep}{word_b}", # wordA+suffix+separator+wordB example: ali1992&Wonder
+                    ]
+
+                    # Add separator-dependent variation if separator exists
+                    if sep:
+                        suffix_variations.append(f"{word_a}{sep}{suff}{word_b}") # wordA+separator+suffix+wordB example: ali&1992Wonder
+
+                    # Optimization: If the basic structure is too long, skip all variations for this suffix
+                    if not self._is_valid_length(suffix_variations[0]):
+                        continue 
+
+                    # A suffix whose base variations are all rejected by the Markov filter can still
+                    # score well with a special char added, so only the base variations are skipped
+                    if skip is None or not skip(len(suffix_variations), word_a, sep, word_b, suff):
+                        yield from suffix_variations
+
+                    # --- Suffix + Special Char Combinations ---
+                    if self.config.add_special_chars:
+                        for special in specials:
+                            # Pre-check length to save processing time (commutative length check)
+                            test_len = f"{word_a}{sep}{word_b}{suff}{special}"
+                            if not self._is_valid_length(test_len):
+                                continue
+                            if skip is not None and skip(14 if sep else 10, word_a, sep, word_b, suff, special):
+                                continue
                                 
-                                for p in suffix_variations:
-                                    count += 1
-                                    if limit is not None and count > limit:
-                                        return
-                                    yield p
-
-                                # --- Suffix + Special Char Combinations ---
-                                if self.config.add_special_chars:
-                                    for special in specials:
-                                        # Pre-check length to save processing time (commutative length check)
-                                        test_len = f"{word_a}{sep}{word_b}{suff}{special}"
-                                        if not self._is_valid_length(test_len):
-                                            continue
-                                        
-                                        # Define all patterns in exact order
-                                        special_variations = [
-                                            # 1. Both at Ends (Split)
-                                            f"{suff}{word_a}{sep}{word_b}{special}", # suffix+wordA+separator+wordB+special example: 1992ali&Wonder!
-                                            f"{special}{word_a}{sep}{word_b}{suff}", # special+wordA+separator+wordB+suffix example: !ali&Wonder1992
-
-                                            # 2. Both at End (Combined)
-                                            f"{word_a}{sep}{word_b}{suff}{special}", # wordA+separator+wordB+suffix+special example: ali&Wonder1992!
-                                            f"{word_a}{sep}{word_b}{special}{suff}", # wordA+separator+wordB+special+suffix example: ali&Wonder!1992
-
-                                            # 3. Both at Start (Combined)
-                                            f"{special}{suff}{word_a}{sep}{word_b}", # special+suffix+wordA+separator+wordB example: !1992ali&Wonder
-                                            f"{suff}{special}{word_a}{sep}{word_b}", # suffix+special+wordA+separator+wordB example: 1992!ali&Wonder
-
-                                            # 4. Middle Injections (One Middle, One End/Start)
-                                            f"{word_a}{suff}{sep}{word_b}{special}", # wordA+suffix+separator+wordB+special example: ali1992&Wonder!
-                                            f"{word_a}{special}{sep}{word_b}{suff}", # wordA+special+separator+wordB+suffix example: ali!&Wonder1992
-                                            f"{special}{word_a}{suff}{sep}{word_b}", # special+wordA+suffix+separator+wordB example: !ali1992&Wonder
-                                            f"{suff}{word_a}{special}{sep}{word_b}", # suffix+wordA+special+separator+wordB example: 1992ali!&Wonder
-                                        ]
-
-                                        # 5. Separator Dependent (Inside Insertions)
-                                        if sep:
-                                            special_variations.extend([
-                                                f"{word_a}{sep}{suff}{word_b}{special}", # wordA+separator+suffix+wordB+special example: ali&1992Wonder!
-                                                f"{word_a}{sep}{special}{word_b}{suff}", # wordA+separator+special+wordB+suffix example: ali&!Wonder1992
-                                                f"{special}{word_a}{sep}{suff}{word_b}", # special+wordA+separator+suffix+wordB example: !ali&1992Wonder
-                                                f"{suff}{word_a}{sep}{special}{word_b}", # suffix+wordA+separator+special+wordB example: 1992ali&!Wonder
-                                            ])
-
-                                        # Yield all generated variations (length checked via test_len optimization)
-                                        for p in special_variations:
-                                            count += 1
-                                            if limit is not None and count > limit:
-                                                return
-                                            yield p  
-    def estimate_password_count(self) -> int:
-        keyword_pools = self._build_base_word_pool()
-        flat_keywords = set(itertools.chain.from_iterable(keyword_pools))
-        len_keywords = len(flat_keywords)
+                            # Define all patterns in exact order
+                            special_variations = [
+                                # 1. Both at Ends (Split)
+                                f"{suff}{word_a}{sep}{word_b}{special}", # suffix+wordA+separator+wordB+special example: 1992ali&Wonder!
+                                f"{special}{word_a}{sep}{word_b}{suff}", # special+wordA+separator+wordB+suffix example: !ali&Wonder1992
 
-        date_pool = set(self._dates_pool())
-        number_pool = set(self._numbers_pool())
-        if self.config.add_common_numbers:
-            number_pool.update(self.config.common_numbers)
-        len_suf = len(number_pool)
+                                # 2. Both at End (Combined)
+                                f"{word_a}{sep}{word_b}{suff}{special}", # wordA+separator+wordB+suffix+special example: ali&Wonder1992!
+                                f"{word_a}{sep}{word_b}{special}{suff}", # wordA+separator+wordB+special+suffix example: ali&Wonder!1992
+
+                                # 3. Both at Start (Combined)
+                                f"{special}{suff}{word_a}{sep}{word_b}", # special+suffix+wordA+separator+wordB example: !1992ali&Wonder
+                                f"{suff}{special}{word_a}{sep}{word_b}", # suffix+special+wordA+separator+wordB example: 1992!ali&Wonder
+
+                                # 4. Middle Injections (One Middle, One End/Start)
+                                f"{word_a}{suff}{sep}{word_b}{special}", # wordA+suffix+separator+wordB+special example: ali1992&Wonder!
+                                f"{word_a}{special}{sep}{word_b}{suff}", # wordA+special+separator+wordB+suffix example: ali!&Wonder1992
+                                f"{special}{word_a}{suff}{sep}{word_b}", # special+wordA+suffix+separator+wordB example: !ali1992&Wonder
+                                f"{suff}{word_a}{special}{sep}{word_b}", # suffix+wordA+special+separator+wordB example: 1992ali!&Wonder
+                            ]
+
+                            # 5. Separator Dependent (Inside Insertions)
+                            if sep:
+                                special_variations.extend([
+                                    f"{word_a}{sep}{suff}{word_b}{special}", # wordA+separator+suffix+wordB+special example: ali&1992Wonder!
+                                    f"{word_a}{sep}{special}{word_b}{suff}", # wordA+separator+special+wordB+suffix example: ali&!Wonder1992
+                                    f"{special}{word_a}{sep}{suff}{word_b}", # special+wordA+separator+suffix+wordB example: !ali&1992Wonder
+                                    f"{suff}{word_a}{sep}{special}{word_b}", # suffix+wordA+separator+special+wordB example: 1992ali&!Wonder
+                                ])
 
-        separators = self.config.separators
-        len_separators = len(separators) if separators else 1  
+                            # Yield all generated variations (length checked via test_len optimization)
+                            yield from special_variations
 
-        if self.config.add_special_chars:
-            len_specials = len(self.config.special_chars)
+    def _strategy_stream(self, name: str, pools: WordPools, deadline: Optional[float]) -> Iterator[str]:
+        """One strategy's passwords, filtered and capped to its quota, stopping at `deadline`."""
+        stream = getattr(self, f"_strategy_{name}")(pools, deadline)
+        if self.profiler is not None:
+            stream = self.profiler.timed_strategy(name, stream, self._strategy_units(pools)[name][1])
+        if self.markov_model is not None:
+            stream = self._markov_filtered(name, stream)
+        quota = self.config.strategy_settings(name)["max_passwords"]
+        if quota is not None:
+            stream = itertools.islice(stream, quota)
+        return stream
+
+    def _enabled_strategies(self) -> List[Tuple[str, float]]:
+        """(name, weight) for every enabled strategy, in order."""
+        return [
+            (name, self.config.strategy_settings(name)["weight"])
+            for name in STRATEGY_NAMES if self._strategy_enabled(name)
+        ]
+
+    def _markov_filtered(self, name: str, stream: Iterator[str]) -> Iterator[str]:
+        # Exact scoring of what the strategy's prefilter let through, in batches so the per-candidate
+        # overhead stays small; quotas count only what survives
+        threshold = self.config.markov_threshold
+        while True:
+            batch = list(itertools.islice(stream, FILTER_BATCH_SIZE))
+            if not batch:
+                return
+            if self.profiler is not None:
+                with self.profiler.phase("markov_filter"):
+                    kept = self.markov_model.filter_batch(batch, threshold)
+                self.profiler.strategy_stats(name)["markov_rejected"] += len(batch) - len(kept)
+            else:
+                kept = self.markov_model.filter_batch(batch, threshold)
+            yield from kept
+
+    def _run_sequential(self, pools: WordPools, deadline: Optional[float]) -> Iterator[str]:
+        # Each strategy gets a share of the time left, proportional to its weight.
+        # Time a strategy doesn't use (because it ran out of candidates) rolls over to the next ones.
+        strategies = self._enabled_strategies()
+        remaining_weight = sum(weight for _, weight in strategies)
+        for name, weight in strategies:
+            strategy_deadline = None
+            if deadline is not None:
+                now = time.monotonic()
+                strategy_deadline = now + (deadline - now) * weight / remaining_weight
+            remaining_weight -= weight
+            yield from self._strategy_stream(name, pools, strategy_deadline)
+
+    def _run_round_robin(self, pools: WordPools, deadline: Optional[float]) -> Iterator[str]:
+        # Strategies take turns emitting a chunk (scaled by weight) so every strategy is represented
+        # even if the run is cut short by max_passwords or the time budget.
+        active = [
+            (self._strategy_stream(name, pools, deadline), max(1, int(ROUND_ROBIN_CHUNK * weight)))
+            for name, weight in self._enabled_strategies()
+        ]
+        while active:
+            still_active = []
+            for stream, chunk in active:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                emitted = 0
+                for password in itertools.islice(stream, chunk):
+                    emitted += 1
+                    yield password
+                if emitted == chunk:
+                    still_active.append((stream, chunk))
+            active = still_active
+
+    def generate_passwords(self) -> Iterator[str]:
+        pools = self._collect_pools()
+
+        deadline = None
+        if self.config.time_budget is not None:
+            deadline = time.monotonic() + self.config.time_budget
+
+        if self.config.schedule == "round_robin":
+            passwords = self._run_round_robin(pools, deadline)
         else:
-            len_specials = 0
-        
-        len_pairs = 0
-        if self.config.max_combination_depth >= 2:
-            for group_a, group_b in itertools.permutations(keyword_pools, 2):
-                len_pairs += len(group_a) * len(group_b)
-            
-        total_count = 0
+            passwords = self._run_sequential(pools, deadline)
 
-        total_count += len_keywords  # Single keywords
-        total_count += 2 * len_keywords * len_separators * len_suf  # Keyword + Suffix combinations
-        total_count += 4 * len_keywords * len_separators * len_suf * len_specials  # Strategy 3 variations 
-        total_count += 2 * len_keywords * len_specials  # Keyword + Special combinations
+        # Max passwords cap
+        limit = self.config.max_passwords if self.config.max_passwords is not None and self.config.max_passwords > 0 else None
+        if limit is not None:
+            passwords = itertools.islice(passwords, limit)
+        yield from passwords
 
-        if self.config.max_combination_depth >= 2:
+    def _strategy_units(self, pools: WordPools) -> Dict[str, Tuple[int, int]]:
+        """(units the strategy iterates over, candidates per unit) for every strategy; --part slices the units."""
+        len_keywords = len(pools.flat_keywords)
+        len_suf = len(pools.suffixes)
+        separators = pools.separators
+        len_specials = len(self.config.special_chars) if self.config.add_special_chars else 0
 
-            total_count += len_pairs * len_separators  # Multi-Word Combinations
+        # Separator-dependent variations are only built for a non-empty separator
+        vars_per_suffix = sum(4 if sep else 3 for sep in separators)  # Base variations
+        vars_per_special = sum(14 if sep else 10 for sep in separators)  # Special variations
 
-            if self.config.max_combination_depth >= 3:
-                vars_per_suffix = (3 * len_separators) + (len_separators - 1) # Base variations
-                total_count += len_pairs * len_suf * vars_per_suffix  # Strategy 6 base variations
+        return {
+            "single": (len(pools.singles), 1),  # Single keywords
+            "keyword_suffix": (len_keywords * len(separators) * len_suf, 2),  # Keyword + Suffix combinations
+            "keyword_suffix_special": (len_keywords * len(separators) * len_suf, 4 * len_specials),  # Strategy 3 variations 
+            "keyword_special": (len_keywords * len_specials, 2),  # Keyword + Special combinations
+            "multi_word": (pools.pair_count, len(separators)),  # Multi-Word Combinations
+            "multi_word_suffix": (pools.pair_count, len_suf * (vars_per_suffix + len_specials * vars_per_special)),  # Strategy 6 variations
+        }
 
-                if len_specials > 0:
-                    vars_per_special = (10 * len_separators) + (4 * (len_separators - 1))  # Special variations 
-                    total_count += len_pairs * len_suf * len_specials * vars_per_special  # Strategy 6 special variations
-        return total_count
\ No newline at end of file
+    def estimate_strategy_counts(self) -> Dict[str, int]:
+        """Estimated number of passwords per strategy for this part, after per-strategy quotas (0 for disabled strategies)."""
+        strategy_units = self._strategy_units(self._collect_pools())
+        counts = {}
+        for name in STRATEGY_NAMES:
+            if not self._strategy_enabled(name):
+                counts[name] = 0
+                continue
+            total_units, per_unit = strategy_units[name]
+            start, stop = self._part_range(total_units)
+            counts[name] = (stop - start) * per_unit
+            quota = self.config.strategy_settings(name)["max_passwords"]
+            if quota is not None:
+                counts[name] = min(counts[name], quota)
+        return counts
+
+    def estimate_password_count(self) -> int:
+        return sum(self.estimate_strategy_counts().values())
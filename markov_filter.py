@@ -0,0 +1,236 @@
+import itertools
+import math
+import struct
+from array import array
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # optional: numpy scores a whole batch at once, otherwise a pure-Python loop is used
+    np = None
+
+VECTORIZED = np is not None  # without numpy, scoring is several times slower than generating the candidates
+
+# Symbols: 0 = start/end of password, 1..95 = printable ASCII (space to '~'), 96 = anything else
+BOUNDARY = 0
+OTHER = 96
+ALPHABET_SIZE = 97
+
+# -log2(p) is stored as one byte in steps of 1/COST_SCALE bits (so at most ~16 bits per transition)
+COST_SCALE = 16
+MAX_COST = 255
+
+MAGIC = b"CUPPMKV1"
+HEADER = struct.Struct("<8sBB")  # magic, order, alphabet size
+
+# byte value -> symbol (non-ASCII characters are scored per UTF-8 byte as OTHER)
+_SYMBOL_TABLE = bytes(i - 31 if 32 <= i <= 126 else OTHER for i in range(256))
+
+
+# same mapping, but '\n' marks the boundary between passwords joined into one batch
+_BATCH_SYMBOL_TABLE = _SYMBOL_TABLE[:10] + bytes([BOUNDARY]) + _SYMBOL_TABLE[11:]
+
+_END = bytes([BOUNDARY])
+
+
+def _symbols(password: str) -> bytes:
+    return password.encode("utf-8").translate(_SYMBOL_TABLE)
+
+
+class MarkovModel:
+    """Character n-gram model used to drop implausible candidates at generation time.
+
+    `order` is the number of preceding characters the next character is conditioned on.
+    The table holds a quantized -log2 probability for every (context, next symbol) pair.
+    """
+
+    def __init__(self, order: int, table: bytes):
+        if order not in (1, 2):
+            raise ValueError("Markov order must be 1 or 2")
+        expected = ALPHABET_SIZE ** (order + 1)
+        if len(table) != expected:
+            raise ValueError(f"Markov table has {len(table)} entries, expected {expected}")
+        self.order = order
+        self.table = table
+        self._np_table = np.frombuffer(table, dtype=np.uint8) if np is not None else None
+
+        if order == 2:
+            # cheapest transition from (any symbol, a) into b, for joins after a one-character token
+            stride = ALPHABET_SIZE * ALPHABET_SIZE
+            self._min_into_pair = [min(table[pair::stride]) for pair in range(stride)]
+
+    @classmethod
+    def train(cls, passwords: Iterable[str], order: int = 2, smoothing: float = 0.01) -> "MarkovModel":
+        """Train from an iterable of passwords (e.g. the lines of a leaked-password corpus)."""
+        if order not in (1, 2):
+            raise ValueError("Markov order must be 1 or 2")
+        context_mod = ALPHABET_SIZE ** order
+        counts = array("L", [0]) * (context_mod * ALPHABET_SIZE)
+        for password in passwords:
+            password = password.rstrip("\r\n")
+            if not password:
+                continue
+            context = 0  # all-boundary context
+            for symbol in _symbols(password):
+                counts[context * ALPHABET_SIZE + symbol] += 1
+                context = (context * ALPHABET_SIZE + symbol) % context_mod
+            counts[context * ALPHABET_SIZE + BOUNDARY] += 1
+
+        table = bytearray(len(counts))
+        for context in range(context_mod):
+            row = context * ALPHABET_SIZE
+            total = sum(counts[row:row + ALPHABET_SIZE]) + smoothing * ALPHABET_SIZE
+            for symbol in range(ALPHABET_SIZE):
+                p = (counts[row + symbol] + smoothing) / total
+                table[row + symbol] = min(MAX_COST, round(-math.log2(p) * COST_SCALE))
+        return cls(order, bytes(table))
+
+    @classmethod
+    def from_file(cls, path: str) -> "MarkovModel":
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"'{path}' is not a Markov model file")
+        magic, order, alphabet_size = HEADER.unpack_from(data)
+        if magic != MAGIC or alphabet_size != ALPHABET_SIZE:
+            raise ValueError(f"'{path}' is not a Markov model file")
+        return cls(order, data[HEADER.size:])
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.order, ALPHABET_SIZE))
+            f.write(self.table)
+
+    def score(self, password: str) -> float:
+        """Average log2 probability per character (including the end of the password); higher is more plausible."""
+        return self.score_batch([password])[0]
+
+    def score_batch(self, passwords: List[str]) -> List[float]:
+        if not passwords:
+            return []
+        if self._np_table is not None:
+            return self._score_batch_numpy(passwords).tolist()
+        if self.order == 1:
+            return self._score_batch_order1(passwords)
+        return self._score_batch_order2(passwords)
+
+    def _score_batch_order1(self, passwords: List[str]) -> List[float]:
+        # `row` is the table offset of the current context (context * ALPHABET_SIZE)
+        table = self.table
+        row_of = [symbol * ALPHABET_SIZE for symbol in range(ALPHABET_SIZE)]
+        scores = []
+        for password in passwords:
+            symbols = _symbols(password)
+            row = 0
+            cost = 0
+            for symbol in symbols:
+                cost += table[row + symbol]
+                row = row_of[symbol]
+            cost += table[row]
+            scores.append(-cost / (COST_SCALE * (len(symbols) + 1)))
+        return scores
+
+    def _score_batch_order2(self, passwords: List[str]) -> List[float]:
+        # the table offset of context (c1, c2) is c1 * A^2 + c2 * A, kept as (outer, inner) parts
+        table = self.table
+        row_of = [symbol * ALPHABET_SIZE for symbol in range(ALPHABET_SIZE)]
+        scores = []
+        for password in passwords:
+            symbols = _symbols(password)
+            outer = inner = 0
+            cost = 0
+            for symbol in symbols:
+                cost += table[outer + inner + symbol]
+                outer = inner * ALPHABET_SIZE
+                inner = row_of[symbol]
+            cost += table[outer + inner]
+            scores.append(-cost / (COST_SCALE * (len(symbols) + 1)))
+        return scores
+
+    def _score_batch_numpy(self, passwords: List[str]):
+        # Join the batch into one symbol array, with `order` boundary symbols between passwords so each
+        # one starts from the all-boundary context, then look up and sum every transition at once.
+        order = self.order
+        text = ("\n" * order).join(passwords)
+        data = text.encode("utf-8")
+        if len(data) == len(text):
+            lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=len(passwords))
+        else:
+            lengths = np.array([len(p.encode("utf-8")) for p in passwords], dtype=np.int64)
+
+        symbols = np.zeros(len(data) + order + 1, dtype=np.int64)
+        symbols[order:order + len(data)] = np.frombuffer(data.translate(_BATCH_SYMBOL_TABLE), dtype=np.uint8)
+        index = symbols[:len(symbols) - order]
+        for i in range(1, order + 1):
+            index = index * ALPHABET_SIZE + symbols[i:len(symbols) - order + i]
+        costs = np.concatenate(([0], np.cumsum(self._np_table[index], dtype=np.int64)))
+
+        # transitions of password j: into each of its symbols, plus into the boundary after it
+        starts = np.concatenate(([0], np.cumsum(lengths + order)[:-1]))
+        totals = costs[starts + lengths + 1] - costs[starts]
+        return -totals / (COST_SCALE * (lengths + 1))
+
+    def _inner_cost(self, symbols: bytes) -> int:
+        """Cost of the transitions of a token that only depend on the token itself."""
+        cost = 0
+        for i in range(self.order, len(symbols)):
+            context = 0
+            for prev in symbols[i - self.order:i]:
+                context = context * ALPHABET_SIZE + prev
+            cost += self.table[context * ALPHABET_SIZE + symbols[i]]
+        return cost
+
+    def _join_cost(self, before: bytes, after: bytes) -> int:
+        """Lowest cost of the first `order` transitions of `after` when it directly follows `before`.
+
+        An empty `before` stands for the start of the password, an `after` of _END for its end.
+        """
+        table = self.table
+        if self.order == 1:
+            return table[(before[-1] if before else BOUNDARY) * ALPHABET_SIZE + after[0]]
+        if len(before) == 1:
+            # the symbol before a one-character token is unknown: take the cheapest
+            last = before[0]
+            cost = self._min_into_pair[last * ALPHABET_SIZE + after[0]]
+        else:
+            prev, last = (bytes(2) + before)[-2:]
+            cost = table[(prev * ALPHABET_SIZE + last) * ALPHABET_SIZE + after[0]]
+        if len(after) > 1:
+            cost += table[(last * ALPHABET_SIZE + after[0]) * ALPHABET_SIZE + after[1]]
+        return cost
+
+    def filter_batch(self, passwords: List[str], threshold: float) -> List[str]:
+        """Keep the passwords scoring at or above `threshold`, in their original order."""
+        if self._np_table is not None and passwords:
+            return list(itertools.compress(passwords, (self._score_batch_numpy(passwords) >= threshold).tolist()))
+        return [p for p, s in zip(passwords, self.score_batch(passwords)) if s >= threshold]
+
+
+class MarkovPrefilter:
+    """Bounds the score of any password assembled from a fixed vocabulary of tokens.
+
+    A strategy builds each group of candidates from the same tokens in different orders. When even the
+    bound fails `threshold`, the whole group can be skipped before it is formatted; what may pass still
+    goes through MarkovModel.filter_batch. A token's bound is the cost of its own transitions plus its
+    cheapest join after the start of the password or after any token of the vocabulary, so the bound of
+    a group is a sum of per-token values computed once.
+    """
+
+    def __init__(self, model: MarkovModel, vocabulary: Iterable[str], threshold: float):
+        allowed = -threshold * COST_SCALE  # cost per symbol a password can afford and still pass
+        parts = {token: _symbols(token) for token in set(vocabulary) if token}
+        tails = {symbols[-model.order:] for symbols in parts.values()}
+        heads = {symbols[:model.order] for symbols in parts.values()}
+        entry = {head: min(model._join_cost(tail, head) for tail in tails | {b""}) for head in heads}
+
+        # score >= threshold  <=>  cost <= allowed * (length + 1), so with each token's allowance taken off
+        # its cost, a group may pass only while the sum stays within what is left for the end transition
+        self.slack: Dict[str, float] = {"": 0.0}
+        for token, symbols in parts.items():
+            self.slack[token] = model._inner_cost(symbols) + entry[symbols[:model.order]] - allowed * len(symbols)
+        end = min((model._join_cost(tail, _END) for tail in tails), default=0)
+        self.limit = allowed - end + 1e-6  # the margin keeps float rounding on the safe side
+
+    def may_pass(self, *tokens: str) -> bool:
+        """False if no password made of exactly these tokens, in any order, can pass the filter."""
+        return sum(map(self.slack.__getitem__, tokens)) <= self.limit
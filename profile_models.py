@@ -3,7 +3,26 @@ from typing import List, Optional
 import json
 import os
 from datetime import date
-from utils import DateUtils
+from utils import DateUtils, parse_duration
+
+# Generation strategies in the order the engine runs them (see engine.PasswordGenerator)
+STRATEGY_NAMES = (
+    "single",                   # strategy 1: single keywords
+    "keyword_suffix",           # strategy 2: keyword + separator + suffix
+    "keyword_suffix_special",   # strategy 3: strategy 2 with special chars
+    "keyword_special",          # strategy 4: keyword + special
+    "multi_word",               # strategy 5: multi-word combinations
+    "multi_word_suffix",        # strategy 6: multi-word combinations with suffix (and special chars)
+)
+SCHEDULES = ("sequential", "round_robin")
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
 
 @dataclass
 class GeneratorConfig:
@@ -35,8 +54,19 @@ class GeneratorConfig:
 
     bruteforce_mode: bool = False
 
+    normalize_keywords: bool = True  # trim/NFC keywords and merge the ones that only differ in case or accents
+    ascii_fold_keywords: bool = False  # also add accent-free spellings (José -> Jose) to normalized keywords
+
     max_passwords: Optional[int] = 1000000000  # 100 million by default, None for unlimited 
 
+    # per-strategy controls, e.g. {"keyword_suffix_special": {"enabled": true, "max_passwords": 1000000, "weight": 1}}
+    strategies: dict = field(default_factory=dict)
+    schedule: str = "sequential"  # "sequential" or "round_robin"
+    time_budget: Optional[float] = None  # wall-clock budget in seconds, None for unlimited
+
+    markov_model: Optional[str] = None  # path to a trained Markov model, None to disable the filter
+    markov_threshold: float = -6.0  # drop candidates whose average log2 probability per char is lower
+
 
     def __post_init__(self):
         if self.min_length > self.max_length:
@@ -45,33 +75,85 @@ class GeneratorConfig:
         if self.leet_level not in [0, 1, 2]:
             raise ValueError("Leet level must be 0, 1, or 2")
         
+        if self.max_passwords is not None and not _is_int(self.max_passwords):
+            raise ValueError("max_passwords must be an integer or null")
         if self.max_passwords is not None and self.max_passwords < 0:
             raise ValueError("max_passwords must be >= 0 when specified")
 
+        for name, settings in self.strategies.items():
+            if name not in STRATEGY_NAMES:
+                raise ValueError(f"Unknown strategy '{name}' (expected one of: {', '.join(STRATEGY_NAMES)})")
+            if not isinstance(settings, dict):
+                raise ValueError(f"Settings for strategy '{name}' must be an object")
+            if not isinstance(settings.get("enabled", True), bool):
+                raise ValueError(f"enabled for strategy '{name}' must be true or false")
+            quota = settings.get("max_passwords")
+            if quota is not None and not _is_int(quota):
+                raise ValueError(f"max_passwords for strategy '{name}' must be an integer or null")
+            if quota is not None and quota < 0:
+                raise ValueError(f"max_passwords for strategy '{name}' must be >= 0 when specified")
+            weight = settings.get("weight", 1)
+            if not _is_number(weight):
+                raise ValueError(f"weight for strategy '{name}' must be a number")
+            if weight <= 0:
+                raise ValueError(f"weight for strategy '{name}' must be > 0")
+
+        if self.schedule not in SCHEDULES:
+            raise ValueError(f"Schedule must be one of: {', '.join(SCHEDULES)}")
+
+        if self.time_budget is not None and not _is_number(self.time_budget):
+            raise ValueError("time_budget must be a number of seconds (config.json also takes e.g. \"10m\")")
+        if self.time_budget is not None and self.time_budget <= 0:
+            raise ValueError("time_budget must be > 0 when specified")
+
+        if self.markov_threshold > 0:
+            raise ValueError("markov_threshold must be <= 0 (it is an average log2 probability)")
+
+    def strategy_settings(self, name: str) -> dict:
+        """Settings for one strategy, with defaults filled in for anything not configured."""
+        settings = {"enabled": True, "max_passwords": None, "weight": 1}
+        settings.update(self.strategies.get(name, {}))
+        return settings
+
     @classmethod
     def from_dict(cls, cfg: dict):
         gen = cfg.get("generator", cfg)  # allow root or nested under "generator"
+        # field(default_factory=...) fields have no class attribute, so read defaults off an instance
+        defaults = cls()
+        time_budget = gen.get("time_budget", defaults.time_budget)
+        if time_budget is not None:
+            time_budget = parse_duration(time_budget)  # same formats as --time-budget, e.g. 600 or "10m"
         return cls(
-            min_length=gen.get("min_length", cls.min_length),
-            max_length=gen.get("max_length", cls.max_length),
-            enable_case_mutations=gen.get("enable_case_mutations", cls.enable_case_mutations),
-            enable_reverse=gen.get("enable_reverse", cls.enable_reverse),
-            leet_level=gen.get("leet_level", cls.leet_level),
-            leet_map=gen.get("leet_map", cls.leet_map),
-            max_combination_depth=gen.get("max_combination_depth", cls.max_combination_depth),
-            add_special_chars=gen.get("add_special_chars", cls.add_special_chars),
-            special_chars=gen.get("special_chars", cls.special_chars),
-            separators=gen.get("separators", cls.separators),
-            add_common_numbers=gen.get("add_common_numbers", cls.add_common_numbers),
-            common_numbers=gen.get("common_numbers", cls.common_numbers),
-            word_leet_threshold=gen.get("word_leet_threshold", cls.word_leet_threshold),
-            bruteforce_mode=gen.get("bruteforce_mode", cls.bruteforce_mode),
-            max_passwords=gen.get("max_passwords", cls.max_passwords),
+            min_length=gen.get("min_length", defaults.min_length),
+            max_length=gen.get("max_length", defaults.max_length),
+            enable_case_mutations=gen.get("enable_case_mutations", defaults.enable_case_mutations),
+            enable_reverse=gen.get("enable_reverse", defaults.enable_reverse),
+            leet_level=gen.get("leet_level", defaults.leet_level),
+            leet_map=gen.get("leet_map", defaults.leet_map),
+            max_combination_depth=gen.get("max_combination_depth", defaults.max_combination_depth),
+            add_special_chars=gen.get("add_special_chars", defaults.add_special_chars),
+            special_chars=gen.get("special_chars", defaults.special_chars),
+            separators=gen.get("separators", defaults.separators),
+            add_common_numbers=gen.get("add_common_numbers", defaults.add_common_numbers),
+            common_numbers=gen.get("common_numbers", defaults.common_numbers),
+            word_leet_threshold=gen.get("word_leet_threshold", defaults.word_leet_threshold),
+            bruteforce_mode=gen.get("bruteforce_mode", defaults.bruteforce_mode),
+            normalize_keywords=gen.get("normalize_keywords", defaults.normalize_keywords),
+            ascii_fold_keywords=gen.get("ascii_fold_keywords", defaults.ascii_fold_keywords),
+            max_passwords=gen.get("max_passwords", defaults.max_passwords),
+            strategies=gen.get("strategies", defaults.strategies),
+            schedule=gen.get("schedule", defaults.schedule),
+            time_budget=time_budget,
+            markov_model=gen.get("markov_model", defaults.markov_model),
+            markov_threshold=gen.get("markov_threshold", defaults.markov_threshold),
         )
 
     @classmethod
     def from_file(cls, path: Optional[str] = None):
-        """Load configuration from a JSON file. Defaults to `config.json` in project root."""
+        """Load configuration from a JSON file. Defaults to `config.json` in project root.
+
+        The first candidate file that exists is used; a ValueError names it if it can't be read or is invalid.
+        """
         candidates = []
         if path:
             candidates.append(path)
@@ -81,15 +163,16 @@ class GeneratorConfig:
         candidates.append(os.path.join(os.path.dirname(__file__), "config.json"))
 
         for p in candidates:
-            try:
-                if os.path.exists(p):
-                    with open(p, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    return cls.from_dict(data)
-            except Exception:
-                # Fall through to next candidate; validation happens in __post_init__
+            if not os.path.exists(p):
                 continue
-        # If no file found or failed to load, return default config
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return cls.from_dict(data)
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                # A file that exists but is broken is reported, not skipped for the next candidate
+                raise ValueError(f"Invalid config file '{p}': {e}") from e
+        # If no file found, return default config
         return cls()
 
 
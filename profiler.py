@@ -0,0 +1,210 @@
+import cProfile
+import itertools
+import json
+import operator
+import os
+import pstats
+import signal
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+TOP_FUNCTIONS = 30  # functions listed in the JSON report, by cumulative time (cProfile) or samples
+PROFILE_CHUNK_SIZE = 4096  # candidates pulled from a strategy (or written out) per timed step
+OVERHEAD_ROOT = "[profiler]"  # root of the sampled stacks caught inside this module's own code
+
+
+class GenerationProfiler:
+    """Timing, hot-path counters and profiler output for one generation run (enabled with --profile).
+
+    The engine only calls into this when a profiler is passed in, so a normal run pays nothing for it.
+    Call stacks are sampled on the main thread by a SIGPROF interval timer, where the platform has one;
+    elsewhere the collapsed stacks are built from the phase timings instead. `use_cprofile` additionally
+    records exact per-function stats, at the cost of slowing the run (and the phase timings) down several times.
+    Only time spent inside `session()` is recorded.
+    """
+
+    def __init__(self, sample_interval: float = 0.005, use_cprofile: bool = False):
+        self.sample_interval = sample_interval
+        self.phases: Dict[str, float] = {}
+        self.strategies: Dict[str, Dict[str, float]] = {}
+        self.samples: Counter = Counter()
+        self._unit_counters: List[Tuple[str, Iterator[int]]] = []
+
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        self._previous_handler = None
+        self._sampling = False
+        self._started_at: Optional[float] = None
+        self.total_seconds = 0.0
+
+    # --- phase timing and counters ---
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        if self._started_at is None:
+            return  # e.g. the word pool built by estimate_password_count() before generation starts
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def strategy_stats(self, name: str) -> Dict[str, float]:
+        if name not in self.strategies:
+            self.strategies[name] = {
+                "seconds": 0.0, "units": 0, "candidates_per_unit": 0, "generated": 0,
+                "markov_skipped": 0, "markov_rejected": 0,
+            }
+        return self.strategies[name]
+
+    def timed_strategy(self, name: str, stream: Iterable[str], candidates_per_unit: int) -> Iterator[str]:
+        """Wrap a strategy stream, timing only the work done inside the strategy and counting what it yields.
+
+        The stream is pulled in chunks so the timing costs next to nothing per candidate; when a quota cuts
+        the strategy short, `generated` can include up to one chunk that was never emitted.
+        """
+        stats = self.strategy_stats(name)
+        stats["candidates_per_unit"] = candidates_per_unit
+        perf_counter = time.perf_counter
+        stream = iter(stream)
+        while True:
+            start = perf_counter()
+            chunk = list(itertools.islice(stream, PROFILE_CHUNK_SIZE))
+            stats["seconds"] += perf_counter() - start
+            if not chunk:
+                return
+            stats["generated"] += len(chunk)
+            yield from chunk
+
+    def counted_units(self, name: str, units: Iterable) -> Iterator:
+        """Pass a strategy's units through, counting them without a Python-level step per unit."""
+        counter = itertools.count(1)
+        self._unit_counters.append((name, counter))
+        # zip stops on the exhausted `units` before taking from `counter`, so its next value is the count + 1
+        return map(operator.itemgetter(0), zip(units, counter))
+
+    def _collect_unit_counts(self):
+        for name, counter in self._unit_counters:
+            self.strategy_stats(name)["units"] += next(counter) - 1
+        self._unit_counters = []
+
+    # --- cProfile and stack sampling ---
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        # SIGPROF is delivered to the main thread, in the middle of whatever it is running, so every
+        # sample shows the real stack; a sampling thread would only see where the GIL is handed over
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGPROF, self._take_sample)
+            signal.setitimer(signal.ITIMER_PROF, self.sample_interval, self.sample_interval)
+            self._sampling = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampling:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self._sampling = False
+        if self._started_at is not None:
+            self.total_seconds += time.perf_counter() - self._started_at
+            self._started_at = None
+        self._collect_unit_counts()
+
+    @contextmanager
+    def session(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _take_sample(self, signum, frame):
+        # The profiler's own frames are left out of the stacks, except when the sample caught the profiler
+        # itself running: then the whole stack goes under OVERHEAD_ROOT, away from the engine's hot paths
+        overhead = frame is not None and frame.f_code.co_filename == __file__
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if overhead or code.co_filename != __file__:
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        if overhead:
+            stack.append(OVERHEAD_ROOT)
+        if stack:
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _phase_stacks(self) -> Counter:
+        # Fallback when no stacks were sampled: one frame per phase/strategy, weighted in milliseconds
+        stacks = Counter()
+        for name, seconds in self.phases.items():
+            stacks[name] = round(seconds * 1000)
+        for name, stats in self.strategies.items():
+            stacks[f"generate_passwords;{name}"] = round(stats["seconds"] * 1000)
+        return +stacks
+
+    # --- report ---
+
+    def _hot_frames(self):
+        # Self time per frame: how often each frame was the innermost one when sampled
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            if stack.startswith(OVERHEAD_ROOT + ";"):
+                continue
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"frame": frame, "samples": count} for frame, count in leaves.most_common(TOP_FUNCTIONS)]
+
+    def _top_functions(self):
+        stats = pstats.Stats(self._cprofile)
+        entries = []
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            entries.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            })
+        entries.sort(key=lambda e: e["cumtime"], reverse=True)
+        return entries[:TOP_FUNCTIONS]
+
+    @staticmethod
+    def _strategy_report(stats: Dict[str, float]) -> Dict[str, float]:
+        # Every unit expands to a fixed number of candidates, and each one is either yielded, skipped by the
+        # Markov prefilter or fails the length check. When a quota, cap or time budget stops the strategy
+        # part-way through a unit, the rest of that unit is counted as length-rejected too.
+        candidates = stats["units"] * stats["candidates_per_unit"]
+        length_rejected = max(0, candidates - stats["generated"] - stats["markov_skipped"])
+        return {**stats, "seconds": round(stats["seconds"], 6), "length_rejected": length_rejected}
+
+    def report(self) -> dict:
+        report = {
+            "total_seconds": round(self.total_seconds, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "strategies": {name: self._strategy_report(stats) for name, stats in self.strategies.items()},
+            "stacks": "sampled" if self.samples else "phases",
+            "sample_interval": self.sample_interval,
+            "samples": sum(self.samples.values()),
+            "profiler_samples": sum(n for stack, n in self.samples.items() if stack.startswith(OVERHEAD_ROOT + ";")),
+            "hot_frames": self._hot_frames(),
+        }
+        if self._cprofile is not None:
+            report["top_functions"] = self._top_functions()
+        return report
+
+    def write_report(self, prefix: str):
+        """Write `<prefix>.json` and a flamegraph-compatible `<prefix>.collapsed`; returns both paths."""
+        json_path = f"{prefix}.json"
+        collapsed_path = f"{prefix}.collapsed"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted((self.samples or self._phase_stacks()).items()):
+                f.write(f"{stack} {count}\n")
+        return json_path, collapsed_path
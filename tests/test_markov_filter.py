@@ -0,0 +1,101 @@
+import itertools
+import random
+
+import pytest
+
+import markov_filter
+from engine import PasswordGenerator
+from markov_filter import ALPHABET_SIZE, COST_SCALE, MarkovModel, MarkovPrefilter
+from profile_models import GeneratorConfig, Pet, Target
+
+THRESHOLDS = (-3.0, -4.0, -5.0, -6.0, -7.0, -8.0)
+SEPARATORS = ["", ".", "_", "and", "xoxo", "1"]
+
+
+def _corpus():
+    rng = random.Random(7)
+    words = ["ali", "love", "dana", "pass", "monkey", "qwerty", "dragon", "sun", "rex", "josé"]
+    corpus = []
+    for _ in range(5000):
+        word = rng.choice(words)
+        if rng.random() < 0.5:
+            word = word.capitalize()
+        corpus.append(word + rng.choice(["", "1", "123", "2000", "!", "_", ".", "69"]) + rng.choice(["", "!", "@"]))
+    return corpus
+
+
+@pytest.fixture(scope="module", params=[1, 2], ids=["order1", "order2"])
+def model(request):
+    return MarkovModel.train(_corpus(), order=request.param)
+
+
+def _reference_score(model, password):
+    # Straight from the definition: one table lookup per transition, starting from the all-boundary context
+    symbols = [b - 31 if 32 <= b <= 126 else 96 for b in password.encode("utf-8")]
+    context = [0] * model.order
+    cost = 0
+    for symbol in symbols + [0]:
+        index = 0
+        for c in context:
+            index = index * ALPHABET_SIZE + c
+        cost += model.table[index * ALPHABET_SIZE + symbol]
+        context = context[1:] + [symbol]
+    return -cost / (COST_SCALE * (len(symbols) + 1))
+
+
+PASSWORDS = ["", "a", "ali1992!", "Dana_love", "xoxo123456789", "José&Zoë", "~ \t\x7f", "q" * 40, "1"]
+
+
+def test_python_scorers_match_reference(model, monkeypatch):
+    monkeypatch.setattr(model, "_np_table", None)
+    expected = [_reference_score(model, p) for p in PASSWORDS]
+    assert model.score_batch(PASSWORDS) == expected
+    assert [model.score(p) for p in PASSWORDS] == expected
+
+
+def test_numpy_scorer_matches_reference(model):
+    if markov_filter.np is None:
+        pytest.skip("numpy is not installed")
+    assert model._score_batch_numpy(PASSWORDS).tolist() == [_reference_score(model, p) for p in PASSWORDS]
+
+
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_prefilter_never_rejects_a_passing_arrangement(model, threshold):
+    vocabulary = ["ali", "Dana", "José", "zoë", "1992", "69", "a", "D", "!", "@", *SEPARATORS]
+    prefilter = MarkovPrefilter(model, vocabulary, threshold)
+    rng = random.Random(threshold)
+    for _ in range(300):
+        tokens = rng.sample(vocabulary, rng.randint(2, 4))
+        if prefilter.may_pass(*tokens):
+            continue
+        for arrangement in itertools.permutations(tokens):
+            assert _reference_score(model, "".join(arrangement)) < threshold, arrangement
+
+
+def _target():
+    return Target(name="José", nickname="Al", pets=[Pet("Zoë")], special_numbers=["7"], special_keywords=["ñu"])
+
+
+def _filter_in_chunks(model, passwords, threshold):
+    while True:
+        chunk = list(itertools.islice(passwords, 4096))
+        if not chunk:
+            return
+        yield from model.filter_batch(chunk, threshold)
+
+
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_prefiltered_output_matches_filtering_the_full_output(model, threshold, tmp_path):
+    model_path = str(tmp_path / "model.bin")
+    model.save(model_path)
+    # depth 3 runs all six strategies; non-ASCII keywords and the empty separator exercise the edge cases
+    base = dict(max_length=9, max_combination_depth=3, separators=SEPARATORS, common_numbers=["1", "69", "2000"],
+                max_passwords=None)
+
+    full = PasswordGenerator(_target(), GeneratorConfig(**base)).generate_passwords()
+    filtered = PasswordGenerator(
+        _target(), GeneratorConfig(**base, markov_model=model_path, markov_threshold=threshold)
+    ).generate_passwords()
+    expected = _filter_in_chunks(model, full, threshold)
+    for got, want in itertools.zip_longest(filtered, expected):
+        assert got == want
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from engine import PasswordGenerator
+from markov_filter import MarkovModel
+from profile_models import GeneratorConfig, Pet, Target
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# depth 3 runs all six strategies; kept short so the whole keyspace stays small
+BASE_CONFIG = dict(max_length=8, max_combination_depth=3, common_numbers=["1", "69"],
+                   separators=["", "_", "xoxo"], max_passwords=None)
+
+
+def _target():
+    return Target(name="José", nickname="Al", pets=[Pet("Zoë")], special_numbers=["7"])
+
+
+def _combined_parts(config, n, **kwargs):
+    combined = Counter()
+    for k in range(1, n + 1):
+        combined.update(PasswordGenerator(_target(), config, part=(k, n), **kwargs).generate_passwords())
+    return combined
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7])
+@pytest.mark.parametrize("schedule", ["sequential", "round_robin"])
+def test_parts_add_up_to_the_unsliced_output(n, schedule):
+    config = GeneratorConfig(**BASE_CONFIG, schedule=schedule)
+    assert _combined_parts(config, n) == Counter(PasswordGenerator(_target(), config).generate_passwords())
+
+
+def test_parts_add_up_with_ascii_folding():
+    config = GeneratorConfig(**BASE_CONFIG, ascii_fold_keywords=True)
+    assert _combined_parts(config, 3) == Counter(PasswordGenerator(_target(), config).generate_passwords())
+
+
+def test_parts_add_up_with_the_markov_filter(tmp_path):
+    model_path = str(tmp_path / "model.bin")
+    MarkovModel.train(["ali1992", "Rex69!", "zoe_2000", "jose.1", "al123"] * 20).save(model_path)
+    config = GeneratorConfig(**BASE_CONFIG, markov_model=model_path, markov_threshold=-6.0)
+    assert _combined_parts(config, 3) == Counter(PasswordGenerator(_target(), config).generate_passwords())
+
+
+_PART_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from engine import PasswordGenerator
+from profile_models import GeneratorConfig, Pet, Target
+target = Target(name="José", nickname="Al", pets=[Pet("Zoë")], special_numbers=["7"])
+config = GeneratorConfig(**%r)
+for password in PasswordGenerator(target, config, part=(int(sys.argv[2]), int(sys.argv[3]))).generate_passwords():
+    sys.stdout.write(password + "\\n")
+""" % BASE_CONFIG
+
+
+def test_parts_from_different_hash_seeds_add_up():
+    # Each node is its own process, so set iteration order must not decide which node gets what
+    n = 3
+    combined = Counter()
+    for k, seed in zip(range(1, n + 1), ["1", "2", "3"]):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONIOENCODING="utf-8")
+        result = subprocess.run([sys.executable, "-c", _PART_SCRIPT, ROOT, str(k), str(n)],
+                                env=env, capture_output=True, check=True)
+        combined.update(result.stdout.decode("utf-8").splitlines())
+    config = GeneratorConfig(**BASE_CONFIG)
+    assert combined == Counter(PasswordGenerator(_target(), config).generate_passwords())
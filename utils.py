@@ -1,5 +1,6 @@
+import unicodedata
 from datetime import date
-from typing import List
+from typing import List, Union
 
 
 class DateUtils:
@@ -20,6 +21,41 @@ class DateUtils:
         ]
     
 
+class TextUtils:
+    @staticmethod
+    def normalize_keyword(word: str) -> str:
+        # "  Mary Ann " -> "MaryAnn"; composed and decomposed accents become the same string (NFC)
+        return "".join(unicodedata.normalize("NFC", word).split())
+
+    @staticmethod
+    def ascii_fold(word: str) -> str:
+        # "José" -> "Jose"; characters without an ASCII base letter are kept as they are
+        decomposed = unicodedata.normalize("NFKD", word)
+        return unicodedata.normalize("NFC", "".join(ch for ch in decomposed if not unicodedata.combining(ch)))
+
+
+def parse_duration(duration: Union[str, float]) -> float:
+    # plain seconds or a number with an s/m/h unit, e.g. 90, "90", "90s", "10m", "1.5h"
+    if isinstance(duration, bool):
+        raise ValueError("Duration must be a number of seconds or use an s/m/h unit (e.g. 90s, 10m, 1h)")
+    if isinstance(duration, (int, float)):
+        seconds = float(duration)
+    else:
+        units = {"s": 1, "m": 60, "h": 3600}
+        value = str(duration).strip().lower()
+        multiplier = 1
+        if value and value[-1] in units:
+            multiplier = units[value[-1]]
+            value = value[:-1]
+        try:
+            seconds = float(value) * multiplier
+        except ValueError:
+            raise ValueError("Duration must be a number of seconds or use an s/m/h unit (e.g. 90s, 10m, 1h)")
+    if not seconds > 0:
+        raise ValueError("Duration must be greater than zero")
+    return seconds
+
+
 def estimate_file_size(password_count: int, min_len: int, max_len: int) -> str:
     if password_count == 0:
         return "0 KB"